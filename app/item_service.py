@@ -0,0 +1,141 @@
+from logging import getLogger
+from typing import List, Optional, Set
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlmodel import Session, select, asc, col
+
+from app.database import get_session
+from app.models import BARCODE_UNIQUE_INDEX, Item, ItemCreate, ItemResponse
+
+logger = getLogger(__name__)
+
+IMPORT_MAX_ATTEMPTS = 3
+
+
+def _item_query():
+    """Base query for items with their category eagerly loaded.
+
+    Any other relationship raises on access instead of silently issuing a lazy SELECT.
+    """
+    return select(Item).options(
+        joinedload(Item.category).raiseload("*"),  # type: ignore[arg-type]
+        raiseload("*"),
+    )
+
+
+def list_items(
+    session: Session, category_id: Optional[int] = None, active_only: bool = True, low_stock_only: bool = False
+) -> List[Item]:
+    """List catalog items, optionally filtered by category or low stock"""
+    query = _item_query()
+    if category_id is not None:
+        query = query.where(Item.category_id == category_id)
+    if active_only:
+        query = query.where(col(Item.is_active).is_(True))
+    if low_stock_only:
+        query = query.where(col(Item.is_low_stock).is_(True))
+    return list(session.exec(query.order_by(asc(Item.name))).unique().all())
+
+
+def get_item_by_barcode(session: Session, barcode: str) -> Optional[Item]:
+    """Look up a single active item by its barcode"""
+    query = _item_query().where(Item.barcode == barcode, col(Item.is_active).is_(True))
+    return session.exec(query).unique().first()
+
+
+def get_item_with_history(session: Session, item_id: int) -> Optional[Item]:
+    """Get an item with its sales history loaded, for reporting"""
+    query = _item_query().options(selectinload(Item.transaction_items))  # type: ignore[arg-type]
+    return session.exec(query.where(Item.id == item_id)).unique().first()
+
+
+def to_item_response(item: Item) -> ItemResponse:
+    """Build API response from an item loaded via the eager query"""
+    if item.id is None:
+        raise ValueError("Item must be persisted before building a response")
+
+    return ItemResponse(
+        id=item.id,
+        barcode=item.barcode,
+        name=item.name,
+        category_id=item.category_id,
+        category_name=item.category.name,
+        wholesale_cost_price=item.wholesale_cost_price,
+        wholesale_selling_price=item.wholesale_selling_price,
+        quantity_per_wholesale=item.quantity_per_wholesale,
+        retail_cost_price=item.retail_cost_price,
+        retail_selling_price=item.retail_selling_price,
+        stock_quantity=item.stock_quantity,
+        minimum_stock=item.minimum_stock,
+        is_active=item.is_active,
+        is_low_stock=item.is_low_stock,
+        created_at=item.created_at,
+        updated_at=item.updated_at,
+    )
+
+
+def get_item_responses(category_id: Optional[int] = None, active_only: bool = True) -> List[ItemResponse]:
+    """List catalog items as response schemas"""
+    with get_session() as session:
+        return [to_item_response(item) for item in list_items(session, category_id, active_only)]
+
+
+def load_barcodes(session: Session) -> Set[str]:
+    """Load barcodes of active items, the set the unique barcode index applies to"""
+    return set(session.exec(select(Item.barcode).where(col(Item.is_active).is_(True))).all())
+
+
+def generate_unique_barcode(existing: Set[str]) -> str:
+    """Generate a barcode not in the known set and reserve it"""
+    candidate = Item.generate_barcode()
+    while candidate in existing:
+        candidate = Item.generate_barcode()
+    existing.add(candidate)
+    return candidate
+
+
+def _violated_constraint(error: IntegrityError) -> Optional[str]:
+    """Name of the constraint or unique index behind an IntegrityError, if the driver reports it"""
+    diag = getattr(error.orig, "diag", None)
+    return getattr(diag, "constraint_name", None)
+
+
+def import_items(items_data: List[ItemCreate]) -> List[Item]:
+    """Create many items at once, generating barcodes for those without one.
+
+    Barcodes are checked against a set loaded once per attempt instead of one SELECT per item.
+    Supplied barcodes that already exist are rejected up front; the unique index still guards
+    generated barcodes against concurrent imports, in which case the batch is retried.
+    """
+    supplied = [data.barcode for data in items_data if data.barcode is not None]
+    has_generated = len(supplied) < len(items_data)
+
+    for attempt in range(1, IMPORT_MAX_ATTEMPTS + 1):
+        with get_session() as session:
+            session.expire_on_commit = False
+            existing = load_barcodes(session)
+            for barcode in supplied:
+                if barcode in existing:
+                    raise ValueError(f"Barcode {barcode} already exists")
+                existing.add(barcode)
+
+            items = [
+                Item(
+                    **data.model_dump(exclude={"barcode"}),
+                    barcode=data.barcode if data.barcode is not None else generate_unique_barcode(existing),
+                )
+                for data in items_data
+            ]
+            session.add_all(items)
+            try:
+                session.commit()
+            except IntegrityError as e:
+                session.rollback()
+                retryable = has_generated and _violated_constraint(e) == BARCODE_UNIQUE_INDEX
+                if not retryable or attempt == IMPORT_MAX_ATTEMPTS:
+                    logger.error(f"Item import failed on attempt {attempt}: {e}")
+                    raise
+                logger.warning(f"Generated barcode collided with a concurrent import on attempt {attempt}, retrying")
+                continue
+            return items
+    return []
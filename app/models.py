@@ -1,11 +1,35 @@
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Session, col, select
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Computed,
+    DateTime,
+    Index,
+    Sequence,
+    SmallInteger,
+    String,
+    func,
+    literal,
+    text,
+    update,
+)
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Type
 from enum import Enum
-import string
+import base64
 import secrets
 
+BARCODE_LENGTH = 10
+BARCODE_RANDOM_BYTES = 8  # 64 random bits, base32-encoded to 13 characters before truncation
+BARCODE_UNIQUE_INDEX = "uq_items_barcode_active"
+TRANSACTION_NUMBER_PREFIX = "TXN"
+
+# Source of transaction numbers; bound to the metadata so create_all creates it before the transactions table
+TRANSACTION_NUMBER_SEQUENCE = Sequence("transaction_number_seq", metadata=SQLModel.metadata)
+
 
 class UserRole(str, Enum):
     ADMIN = "Admin"
@@ -23,6 +47,48 @@ class TransactionStatus(str, Enum):
     CANCELLED = "Cancelled"
 
 
+class SmallIntEnum(TypeDecorator):
+    """Store a str Enum as a SMALLINT code (1-based declaration order); append new members, never reorder"""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: Type[Enum]) -> None:
+        super().__init__()
+        self.enum_class = enum_class
+        self._codes = {member: code for code, member in enumerate(enum_class, start=1)}
+        self._members = {code: member for member, code in self._codes.items()}
+
+    def process_bind_param(self, value: Optional[Enum], dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return self._codes[self.enum_class(value)]
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[Enum]:
+        if value is None:
+            return None
+        return self._members[value]
+
+
+def compute_line(
+    quantity: int,
+    unit_type: UnitType,
+    quantity_per_wholesale: int,
+    retail_selling_price: Decimal,
+    wholesale_selling_price: Decimal,
+) -> Tuple[Decimal, int]:
+    """Get unit price and Ecer quantity for a sale line from plain item pricing values"""
+    if unit_type == UnitType.GROSIR:
+        return wholesale_selling_price, quantity * quantity_per_wholesale
+    return retail_selling_price, quantity
+
+
+def compute_line_totals(quantity: int, unit_price: Decimal) -> Tuple[Decimal, int]:
+    """Get a sale line's total price and the same total in integer cents, derived from the cents value"""
+    total_price_cents = quantity * int(unit_price * 100)
+    return Decimal(total_price_cents) / 100, total_price_cents
+
+
 # Persistent models (stored in database)
 class User(SQLModel, table=True):
     __tablename__ = "users"  # type: ignore[assignment]
@@ -31,10 +97,16 @@ class User(SQLModel, table=True):
     username: str = Field(max_length=50, unique=True, index=True)
     password_hash: str = Field(max_length=255)  # Store hashed passwords
     full_name: str = Field(max_length=100)
-    role: UserRole = Field(default=UserRole.KASIR)
+    role: UserRole = Field(default=UserRole.KASIR, sa_column=Column(SmallIntEnum(UserRole), nullable=False))
     is_active: bool = Field(default=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Server-generated: default None keeps them optional in the constructor and out of the INSERT
+    created_at: datetime = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    )
+    updated_at: datetime = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False),
+    )
 
     # Relationships
     transactions: List["Transaction"] = Relationship(back_populates="user")
@@ -47,8 +119,13 @@ class Category(SQLModel, table=True):
     name: str = Field(max_length=100, unique=True, index=True)
     description: str = Field(default="", max_length=500)
     is_active: bool = Field(default=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    )
+    updated_at: datetime = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False),
+    )
 
     # Relationships
     items: List["Item"] = Relationship(back_populates="category")
@@ -56,37 +133,62 @@ class Category(SQLModel, table=True):
 
 class Item(SQLModel, table=True):
     __tablename__ = "items"  # type: ignore[assignment]
+    __table_args__ = (
+        # Barcodes and names only need to be unique among active items, so deactivated ones can be reused
+        Index(BARCODE_UNIQUE_INDEX, "barcode", unique=True, postgresql_where=text("is_active")),
+        Index("uq_items_name_active", "name", unique=True, postgresql_where=text("is_active")),
+        Index("ix_items_category_active", "category_id", "is_active"),
+        Index("ix_items_low_stock", "id", postgresql_where=text("is_low_stock")),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    barcode: str = Field(max_length=20, unique=True, index=True)
-    name: str = Field(max_length=200, unique=True, index=True)
+    barcode: str = Field(max_length=20)
+    name: str = Field(max_length=200)
     category_id: int = Field(foreign_key="categories.id")
 
     # Wholesale (Grosir) pricing and units
-    wholesale_cost_price: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    wholesale_selling_price: Decimal = Field(default=Decimal("0"), decimal_places=2)
+    wholesale_cost_price: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    wholesale_selling_price: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
     quantity_per_wholesale: int = Field(default=1, gt=0)  # How many Ecer units in 1 Grosir
 
     # Retail (Ecer) pricing - base unit
-    retail_cost_price: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    retail_selling_price: Decimal = Field(default=Decimal("0"), decimal_places=2)
+    retail_cost_price: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    retail_selling_price: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
 
     # Stock is always managed in smallest unit (Ecer)
     stock_quantity: int = Field(default=0, ge=0)
     minimum_stock: int = Field(default=0, ge=0)
+    # Generated by the database and read back after flush; the ORM leaves None values out of the INSERT
+    is_low_stock: bool = Field(
+        default=None, sa_column=Column(Boolean, Computed("stock_quantity <= minimum_stock", persisted=True))
+    )
 
     is_active: bool = Field(default=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    )
+    updated_at: datetime = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False),
+    )
 
     # Relationships
-    category: Category = Relationship(back_populates="items")
-    transaction_items: List["TransactionItem"] = Relationship(back_populates="item")
-
-    def generate_barcode(self) -> str:
-        """Generate a 10-character alphanumeric uppercase barcode"""
-        characters = string.ascii_uppercase + string.digits
-        return "".join(secrets.choice(characters) for _ in range(10))
+    category: Category = Relationship(back_populates="items", sa_relationship_kwargs={"lazy": "joined"})
+    # Sales history can be large; load it explicitly with selectinload() where needed
+    transaction_items: List["TransactionItem"] = Relationship(
+        back_populates="item", sa_relationship_kwargs={"lazy": "raise"}
+    )
+
+    @staticmethod
+    def generate_barcode() -> str:
+        """Generate a 10-character alphanumeric uppercase barcode (base32 alphabet A-Z, 2-7)"""
+        return base64.b32encode(secrets.token_bytes(BARCODE_RANDOM_BYTES)).decode("ascii")[:BARCODE_LENGTH]
+
+    def price_line(self, quantity: int, unit_type: UnitType) -> Tuple[Decimal, int]:
+        """Get unit price and Ecer quantity for a sale line of this item"""
+        return compute_line(
+            quantity, unit_type, self.quantity_per_wholesale, self.retail_selling_price, self.wholesale_selling_price
+        )
 
     def get_price_by_unit(self, unit_type: UnitType) -> Decimal:
         """Get selling price based on unit type"""
@@ -108,39 +210,95 @@ class Item(SQLModel, table=True):
 
 class Transaction(SQLModel, table=True):
     __tablename__ = "transactions"  # type: ignore[assignment]
+    __table_args__ = (
+        Index("ix_tx_user_date", "user_id", "transaction_date"),
+        Index("ix_tx_status_date", "status", "transaction_date"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    transaction_number: str = Field(max_length=50, unique=True, index=True)
+    # Assigned by the database on insert, e.g. TXN000000042; default None keeps it out of the INSERT
+    transaction_number: str = Field(
+        default=None,
+        sa_column=Column(
+            String(50),
+            server_default=text(
+                f"'{TRANSACTION_NUMBER_PREFIX}' || to_char(nextval('{TRANSACTION_NUMBER_SEQUENCE.name}'), 'FM000000000')"
+            ),
+            unique=True,
+            index=True,
+            nullable=False,
+        ),
+    )
     user_id: int = Field(foreign_key="users.id")
 
-    subtotal: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    tax_amount: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    discount_amount: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    total_amount: Decimal = Field(default=Decimal("0"), decimal_places=2)
+    subtotal: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    tax_amount: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    discount_amount: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    total_amount: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
 
-    payment_amount: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    change_amount: Decimal = Field(default=Decimal("0"), decimal_places=2)
+    payment_amount: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    change_amount: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
 
-    status: TransactionStatus = Field(default=TransactionStatus.PENDING)
+    status: TransactionStatus = Field(
+        default=TransactionStatus.PENDING, sa_column=Column(SmallIntEnum(TransactionStatus), nullable=False)
+    )
     notes: str = Field(default="", max_length=500)
 
-    transaction_date: datetime = Field(default_factory=datetime.utcnow)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    transaction_date: datetime = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    )
+    created_at: datetime = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    )
+    updated_at: datetime = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False),
+    )
 
     # Relationships
-    user: User = Relationship(back_populates="transactions")
-    transaction_items: List["TransactionItem"] = Relationship(back_populates="transaction")
-
-    def generate_transaction_number(self) -> str:
-        """Generate a unique transaction number"""
-        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        random_suffix = "".join(secrets.choice(string.digits) for _ in range(4))
-        return f"TXN{timestamp}{random_suffix}"
+    user: User = Relationship(back_populates="transactions", sa_relationship_kwargs={"lazy": "joined"})
+    # Unloaded lines are left to the database's ON DELETE CASCADE. Lines are selectin-loaded with the
+    # transaction, though, so session.delete() still deletes those one by one; use
+    # transaction_service.delete_transaction for a single-statement delete.
+    transaction_items: List["TransactionItem"] = Relationship(
+        back_populates="transaction",
+        cascade_delete=True,
+        passive_deletes=True,
+        sa_relationship_kwargs={"lazy": "selectin"},
+    )
+
+    @classmethod
+    def recompute_totals(cls, session: Session, transaction_id: int) -> Decimal:
+        """Recalculate subtotal, total and change in a single UPDATE without loading transaction items.
+
+        The line sum is aggregated once in a derived table (UPDATE ... FROM) and read by every column.
+        Returns the new total amount.
+        """
+        line_totals = (
+            select(
+                literal(transaction_id).label("transaction_id"),
+                (func.coalesce(func.sum(TransactionItem.total_price_cents), 0) / 100).label("subtotal"),
+            )
+            .where(TransactionItem.transaction_id == transaction_id)
+            .subquery()
+        )
+        total_amount = line_totals.c.subtotal + cls.tax_amount - cls.discount_amount
+        return session.scalars(
+            update(cls)
+            .where(cls.id == line_totals.c.transaction_id)  # type: ignore[arg-type]
+            .values(
+                subtotal=line_totals.c.subtotal,
+                total_amount=total_amount,
+                change_amount=func.greatest(Decimal("0"), cls.payment_amount - total_amount),
+            )
+            .returning(col(cls.total_amount))
+            .execution_options(synchronize_session="fetch")
+        ).one()
 
     def calculate_totals(self) -> None:
         """Calculate subtotal and total from transaction items"""
-        self.subtotal = sum((item.total_price for item in self.transaction_items), Decimal("0"))
+        subtotal_cents = sum(line.total_price_cents for line in self.transaction_items)
+        self.subtotal = Decimal(subtotal_cents) / 100
         self.total_amount = self.subtotal + self.tax_amount - self.discount_amount
         self.change_amount = max(Decimal("0"), self.payment_amount - self.total_amount)
 
@@ -149,28 +307,38 @@ class TransactionItem(SQLModel, table=True):
     __tablename__ = "transaction_items"  # type: ignore[assignment]
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    transaction_id: int = Field(foreign_key="transactions.id")
+    transaction_id: int = Field(foreign_key="transactions.id", ondelete="CASCADE")
     item_id: int = Field(foreign_key="items.id")
 
     quantity: int = Field(gt=0)
-    unit_type: UnitType = Field(default=UnitType.ECER)
-    unit_price: Decimal = Field(decimal_places=2)  # Price per unit at time of sale
-    total_price: Decimal = Field(decimal_places=2)  # quantity * unit_price
+    unit_type: UnitType = Field(default=UnitType.ECER, sa_column=Column(SmallIntEnum(UnitType), nullable=False))
+    unit_price: Decimal = Field(max_digits=12, decimal_places=2)  # Price per unit at time of sale
+    total_price: Decimal = Field(max_digits=12, decimal_places=2)  # quantity * unit_price
+    total_price_cents: int = Field(sa_type=BigInteger)  # total_price in integer cents; all subtotals sum this
 
     # Store the quantity in Ecer units for stock management
     ecer_quantity: int = Field(gt=0)  # Converted quantity in base units
 
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    )
 
     # Relationships
-    transaction: Transaction = Relationship(back_populates="transaction_items")
-    item: Item = Relationship(back_populates="transaction_items")
+    transaction: Transaction = Relationship(
+        back_populates="transaction_items", sa_relationship_kwargs={"lazy": "selectin"}
+    )
+    item: Item = Relationship(back_populates="transaction_items", sa_relationship_kwargs={"lazy": "joined"})
 
     def calculate_totals(self, item: Item) -> None:
         """Calculate total price and ecer quantity"""
-        self.unit_price = item.get_price_by_unit(self.unit_type)
-        self.total_price = Decimal(str(self.quantity)) * self.unit_price
-        self.ecer_quantity = item.convert_to_ecer_quantity(self.quantity, self.unit_type)
+        unit_price, ecer_quantity = item.price_line(self.quantity, self.unit_type)
+        self.apply_pricing(unit_price, ecer_quantity)
+
+    def apply_pricing(self, unit_price: Decimal, ecer_quantity: int) -> None:
+        """Set unit price, totals and ecer quantity from precomputed line pricing"""
+        self.unit_price = unit_price
+        self.total_price, self.total_price_cents = compute_line_totals(self.quantity, unit_price)
+        self.ecer_quantity = ecer_quantity
 
 
 # Stock movement tracking
@@ -179,7 +347,7 @@ class StockMovement(SQLModel, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True)
     item_id: int = Field(foreign_key="items.id")
-    transaction_item_id: Optional[int] = Field(foreign_key="transaction_items.id", default=None)
+    transaction_item_id: Optional[int] = Field(foreign_key="transaction_items.id", default=None, ondelete="SET NULL")
 
     movement_type: str = Field(max_length=20)  # 'SALE', 'ADJUSTMENT', 'RESTOCK'
     quantity_change: int = Field()  # Positive for additions, negative for sales
@@ -187,7 +355,9 @@ class StockMovement(SQLModel, table=True):
     new_stock: int = Field(ge=0)
 
     reason: str = Field(default="", max_length=200)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    )
     created_by: int = Field(foreign_key="users.id")
 
 
@@ -221,11 +391,11 @@ class ItemCreate(SQLModel, table=False):
     barcode: Optional[str] = Field(default=None, max_length=20)  # Auto-generated if None
     name: str = Field(max_length=200)
     category_id: int
-    wholesale_cost_price: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    wholesale_selling_price: Decimal = Field(default=Decimal("0"), decimal_places=2)
+    wholesale_cost_price: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    wholesale_selling_price: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
     quantity_per_wholesale: int = Field(default=1, gt=0)
-    retail_cost_price: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    retail_selling_price: Decimal = Field(default=Decimal("0"), decimal_places=2)
+    retail_cost_price: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    retail_selling_price: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
     stock_quantity: int = Field(default=0, ge=0)
     minimum_stock: int = Field(default=0, ge=0)
 
@@ -233,11 +403,11 @@ class ItemCreate(SQLModel, table=False):
 class ItemUpdate(SQLModel, table=False):
     name: Optional[str] = Field(default=None, max_length=200)
     category_id: Optional[int] = Field(default=None)
-    wholesale_cost_price: Optional[Decimal] = Field(default=None, decimal_places=2)
-    wholesale_selling_price: Optional[Decimal] = Field(default=None, decimal_places=2)
+    wholesale_cost_price: Optional[Decimal] = Field(default=None, max_digits=12, decimal_places=2)
+    wholesale_selling_price: Optional[Decimal] = Field(default=None, max_digits=12, decimal_places=2)
     quantity_per_wholesale: Optional[int] = Field(default=None, gt=0)
-    retail_cost_price: Optional[Decimal] = Field(default=None, decimal_places=2)
-    retail_selling_price: Optional[Decimal] = Field(default=None, decimal_places=2)
+    retail_cost_price: Optional[Decimal] = Field(default=None, max_digits=12, decimal_places=2)
+    retail_selling_price: Optional[Decimal] = Field(default=None, max_digits=12, decimal_places=2)
     stock_quantity: Optional[int] = Field(default=None, ge=0)
     minimum_stock: Optional[int] = Field(default=None, ge=0)
     is_active: Optional[bool] = Field(default=None)
@@ -245,9 +415,9 @@ class ItemUpdate(SQLModel, table=False):
 
 class TransactionCreate(SQLModel, table=False):
     items: List[Dict[str, Any]] = Field(default=[])  # List of {item_id, quantity, unit_type}
-    tax_amount: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    discount_amount: Decimal = Field(default=Decimal("0"), decimal_places=2)
-    payment_amount: Decimal = Field(decimal_places=2)
+    tax_amount: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    discount_amount: Decimal = Field(default=Decimal("0"), max_digits=12, decimal_places=2)
+    payment_amount: Decimal = Field(max_digits=12, decimal_places=2)
     notes: str = Field(default="", max_length=500)
 
 
@@ -279,8 +449,8 @@ class ItemResponse(SQLModel, table=False):
     minimum_stock: int
     is_active: bool
     is_low_stock: bool
-    created_at: str  # ISO format string
-    updated_at: str  # ISO format string
+    created_at: datetime
+    updated_at: datetime
 
 
 class TransactionResponse(SQLModel, table=False):
@@ -296,5 +466,5 @@ class TransactionResponse(SQLModel, table=False):
     change_amount: Decimal
     status: TransactionStatus
     notes: str
-    transaction_date: str  # ISO format string
+    transaction_date: datetime
     items: List[Dict[str, Any]]
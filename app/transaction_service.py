@@ -0,0 +1,257 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import Integer, column, delete, insert, select as sa_select, update, values
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlmodel import Session, select, desc, func, col
+
+from app.database import get_session
+from app.models import (
+    Item,
+    StockMovement,
+    Transaction,
+    TransactionCreate,
+    TransactionItem,
+    TransactionItemCreate,
+    TransactionResponse,
+    TransactionStatus,
+    compute_line,
+    compute_line_totals,
+)
+
+
+def _transaction_query():
+    """Base query for transactions with items, their products and the cashier eagerly loaded.
+
+    Any other relationship raises on access instead of silently issuing a lazy SELECT.
+    """
+    return select(Transaction).options(
+        selectinload(Transaction.transaction_items).options(  # type: ignore[arg-type]
+            joinedload(TransactionItem.item).raiseload("*"),  # type: ignore[arg-type]
+            raiseload("*"),
+        ),
+        joinedload(Transaction.user).raiseload("*"),  # type: ignore[arg-type]
+        raiseload("*"),
+    )
+
+
+def list_transactions(
+    session: Session,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    status: Optional[TransactionStatus] = None,
+    limit: int = 100,
+) -> List[Transaction]:
+    """List most recent transactions, optionally filtered by cashier, start date (timezone-aware) and status"""
+    query = _transaction_query()
+    if user_id is not None:
+        query = query.where(Transaction.user_id == user_id)
+    if status is not None:
+        query = query.where(Transaction.status == status)
+    if since is not None:
+        query = query.where(Transaction.transaction_date >= since)
+    query = query.order_by(desc(Transaction.transaction_date)).limit(limit)
+    return list(session.exec(query).unique().all())
+
+
+def get_transaction(session: Session, transaction_id: int) -> Optional[Transaction]:
+    """Get a single transaction with its items loaded"""
+    return session.exec(_transaction_query().where(Transaction.id == transaction_id)).unique().first()
+
+
+def lock_items(session: Session, item_ids: Set[int]) -> Dict[int, Tuple[int, int, Decimal, Decimal]]:
+    """Lock item rows and read (stock, quantity_per_wholesale, retail, wholesale price) in one SELECT ... FOR UPDATE.
+
+    Only active items are returned, so deactivated ids are reported as not found when pricing.
+    Rows are locked in id order so concurrent checkouts cannot deadlock on each other.
+    """
+    query = (
+        sa_select(
+            col(Item.id),
+            col(Item.stock_quantity),
+            col(Item.quantity_per_wholesale),
+            col(Item.retail_selling_price),
+            col(Item.wholesale_selling_price),
+        )
+        .where(col(Item.id).in_(item_ids), col(Item.is_active).is_(True))
+        .order_by(col(Item.id))
+        .with_for_update()
+    )
+    return {
+        item_id: (stock, quantity_per_wholesale, retail_price, wholesale_price)
+        for item_id, stock, quantity_per_wholesale, retail_price, wholesale_price in session.execute(query).tuples()
+    }
+
+
+def price_lines(
+    lines: List[TransactionItemCreate], items: Dict[int, Tuple[int, int, Decimal, Decimal]]
+) -> List[Dict[str, Any]]:
+    """Price cart lines into transaction item rows, using items as returned by lock_items"""
+    rows: List[Dict[str, Any]] = []
+    for line in lines:
+        item = items.get(line.item_id)
+        if item is None:
+            raise ValueError(f"Item {line.item_id} not found")
+
+        unit_price, ecer_quantity = compute_line(line.quantity, line.unit_type, *item[1:])
+        total_price, total_price_cents = compute_line_totals(line.quantity, unit_price)
+        rows.append(
+            {
+                "item_id": line.item_id,
+                "quantity": line.quantity,
+                "unit_type": line.unit_type,
+                "unit_price": unit_price,
+                "total_price": total_price,
+                "total_price_cents": total_price_cents,
+                "ecer_quantity": ecer_quantity,
+            }
+        )
+    return rows
+
+
+def checkout(user_id: int, data: TransactionCreate) -> int:
+    """Create a completed transaction, its lines and stock movements, and deduct stock.
+
+    Lines and stock movements are each written with one executemany INSERT and stock is deducted
+    with a single UPDATE ... FROM (VALUES ...), rather than through the ORM unit of work.
+    Stock, discount and payment are checked before anything is written.
+    Returns the new transaction id.
+    """
+    lines = [TransactionItemCreate.model_validate(raw) for raw in data.items]
+    if not lines:
+        raise ValueError("Transaction must contain at least one item")
+
+    with get_session() as session:
+        # Lock the cart's item rows so the checks below hold until commit
+        items = lock_items(session, {line.item_id for line in lines})
+        line_rows = price_lines(lines, items)
+
+        required: Dict[int, int] = {}
+        for row in line_rows:
+            required[row["item_id"]] = required.get(row["item_id"], 0) + row["ecer_quantity"]
+        for item_id, quantity in required.items():
+            if items[item_id][0] < quantity:
+                raise ValueError(f"Insufficient stock for item {item_id}")
+
+        # Check the total before any write, so a rejected sale does not consume a transaction number
+        subtotal = Decimal(sum(row["total_price_cents"] for row in line_rows)) / 100
+        total_amount = subtotal + data.tax_amount - data.discount_amount
+        if total_amount < 0:
+            raise ValueError("Discount exceeds the transaction total")
+        if data.payment_amount < total_amount:
+            raise ValueError("Insufficient payment")
+
+        transaction = Transaction(
+            user_id=user_id,
+            tax_amount=data.tax_amount,
+            discount_amount=data.discount_amount,
+            payment_amount=data.payment_amount,
+            status=TransactionStatus.COMPLETED,
+            notes=data.notes,
+        )
+        session.add(transaction)
+        session.flush()
+        if transaction.id is None:
+            raise ValueError("Transaction was not assigned an id")
+        transaction_id = transaction.id
+
+        for row in line_rows:
+            row["transaction_id"] = transaction_id
+        line_ids = session.scalars(
+            insert(TransactionItem).returning(col(TransactionItem.id), sort_by_parameter_order=True), line_rows
+        ).all()
+
+        deltas = values(column("target_id", Integer), column("delta", Integer), name="deltas").data(
+            list(required.items())
+        )
+        session.execute(
+            update(Item)
+            .where(col(Item.id) == deltas.c.target_id)
+            .values(stock_quantity=col(Item.stock_quantity) - deltas.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+
+        stock = {item_id: item[0] for item_id, item in items.items()}
+        movement_rows: List[Dict[str, Any]] = []
+        for line_id, row in zip(line_ids, line_rows, strict=True):
+            previous_stock = stock[row["item_id"]]
+            stock[row["item_id"]] = previous_stock - row["ecer_quantity"]
+            movement_rows.append(
+                {
+                    "item_id": row["item_id"],
+                    "transaction_item_id": line_id,
+                    "movement_type": "SALE",
+                    "quantity_change": -row["ecer_quantity"],
+                    "previous_stock": previous_stock,
+                    "new_stock": stock[row["item_id"]],
+                    "reason": f"Sale {transaction.transaction_number}",
+                    "created_by": user_id,
+                }
+            )
+        session.execute(insert(StockMovement), movement_rows)
+
+        Transaction.recompute_totals(session, transaction_id)
+        session.commit()
+        return transaction_id
+
+
+def delete_transaction(session: Session, transaction_id: int) -> bool:
+    """Delete a transaction with one DELETE, leaving its lines to ON DELETE CASCADE.
+
+    Returns whether a transaction was deleted. The caller commits.
+    """
+    result = session.execute(
+        delete(Transaction).where(col(Transaction.id) == transaction_id).execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0  # type: ignore[attr-defined]
+
+
+def get_subtotal(session: Session, transaction_id: int) -> Decimal:
+    """Sum a transaction's line totals in the database"""
+    query = select(func.sum(TransactionItem.total_price_cents)).where(TransactionItem.transaction_id == transaction_id)
+    result = session.exec(query).first()
+    cents = result if result is not None else 0
+    return Decimal(cents) / 100
+
+
+def to_transaction_response(transaction: Transaction) -> TransactionResponse:
+    """Build API response from a transaction loaded via the eager query"""
+    if transaction.id is None:
+        raise ValueError("Transaction must be persisted before building a response")
+
+    items = [
+        {
+            "item_id": line.item_id,
+            "item_name": line.item.name,
+            "quantity": line.quantity,
+            "unit_type": line.unit_type,
+            "unit_price": line.unit_price,
+            "total_price": line.total_price,
+            "ecer_quantity": line.ecer_quantity,
+        }
+        for line in transaction.transaction_items
+    ]
+    return TransactionResponse(
+        id=transaction.id,
+        transaction_number=transaction.transaction_number,
+        user_id=transaction.user_id,
+        user_name=transaction.user.full_name,
+        subtotal=transaction.subtotal,
+        tax_amount=transaction.tax_amount,
+        discount_amount=transaction.discount_amount,
+        total_amount=transaction.total_amount,
+        payment_amount=transaction.payment_amount,
+        change_amount=transaction.change_amount,
+        status=transaction.status,
+        notes=transaction.notes,
+        transaction_date=transaction.transaction_date,
+        items=items,
+    )
+
+
+def get_transaction_responses(
+    user_id: Optional[int] = None, since: Optional[datetime] = None, limit: int = 100
+) -> List[TransactionResponse]:
+    """List transactions as response schemas"""
+    with get_session() as session:
+        return [to_transaction_response(t) for t in list_transactions(session, user_id, since, limit=limit)]
@@ -1,5 +1,7 @@
-from typing import Generator
+from typing import Generator, List
 import pytest
+from sqlalchemy import event
+from app.database import ENGINE, reset_db
 from app.startup import startup
 from nicegui.testing import User
 
@@ -10,3 +12,24 @@ pytest_plugins = ["nicegui.testing.plugin"]
 def user(user: User) -> Generator[User, None, None]:
     startup()
     yield user
+
+
+@pytest.fixture
+def clean_db() -> Generator[None, None, None]:
+    """Reset database for each test"""
+    reset_db()
+    yield
+    reset_db()
+
+
+@pytest.fixture
+def query_counter() -> Generator[List[str], None, None]:
+    """Collect every SQL statement sent to the database while the test runs"""
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(ENGINE, "before_cursor_execute", record)
+    yield statements
+    event.remove(ENGINE, "before_cursor_execute", record)
@@ -0,0 +1,180 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
+from sqlmodel import select
+
+from app.database import get_session
+from app.item_service import (
+    generate_unique_barcode,
+    get_item_by_barcode,
+    get_item_responses,
+    get_item_with_history,
+    import_items,
+    list_items,
+)
+from app.models import Category, Item, ItemCreate
+
+
+@pytest.fixture
+def sample_items(clean_db):
+    with get_session() as session:
+        category = Category(name="Makanan")
+        session.add(category)
+        session.commit()
+        session.refresh(category)
+        if category.id is None:
+            pytest.fail("Sample category was not persisted")
+
+        session.add_all(
+            [
+                Item(
+                    barcode=f"IT{i:08d}",
+                    name=f"Item {i}",
+                    category_id=category.id,
+                    retail_selling_price=Decimal("2500"),
+                    stock_quantity=i,
+                    minimum_stock=2,
+                    is_active=i != 4,
+                )
+                for i in range(5)
+            ]
+        )
+        session.commit()
+        return category.id
+
+
+def test_list_items_single_query(sample_items, query_counter):
+    with get_session() as session:
+        query_counter.clear()
+        items = list_items(session)
+        assert all(item.category.name == "Makanan" for item in items)
+
+    assert len(items) == 4
+    assert len(query_counter) == 1
+
+
+def test_list_items_raises_on_transaction_history(sample_items):
+    with get_session() as session:
+        item = list_items(session)[0]
+        with pytest.raises(InvalidRequestError):
+            _ = item.transaction_items
+
+
+def test_item_history_requires_explicit_load(sample_items):
+    with get_session() as session:
+        item = session.exec(select(Item).where(Item.barcode == "IT00000000")).one()
+        with pytest.raises(InvalidRequestError):
+            _ = item.transaction_items
+
+        if item.id is None:
+            pytest.fail("Sample item was not persisted")
+        loaded = get_item_with_history(session, item.id)
+        assert loaded is not None
+        assert loaded.transaction_items == []
+
+
+def test_get_item_by_barcode(sample_items):
+    with get_session() as session:
+        item = get_item_by_barcode(session, "IT00000001")
+        assert item is not None
+        assert item.name == "Item 1"
+        assert get_item_by_barcode(session, "MISSING") is None
+
+
+def test_get_item_responses_low_stock(sample_items):
+    responses = get_item_responses(category_id=sample_items)
+
+    assert [r.is_low_stock for r in responses] == [True, True, True, False]
+    assert all(r.category_name == "Makanan" for r in responses)
+
+
+def test_list_low_stock_items(sample_items):
+    with get_session() as session:
+        items = list_items(session, low_stock_only=True)
+        assert [item.name for item in items] == ["Item 0", "Item 1", "Item 2"]
+
+        item = items[0]
+        item.stock_quantity = 10
+        session.add(item)
+        session.commit()
+        session.refresh(item)
+        assert not item.is_low_stock
+
+
+def test_generate_unique_barcode_reserves_candidate():
+    existing = {"AAAAAAAAAA"}
+    barcode = generate_unique_barcode(existing)
+
+    assert barcode != "AAAAAAAAAA"
+    assert barcode in existing
+
+
+def test_import_items(sample_items, query_counter):
+    query_counter.clear()
+    items = import_items(
+        [ItemCreate(name=f"Import {i}", category_id=sample_items, stock_quantity=i) for i in range(20)]
+        + [ItemCreate(barcode="CUSTOM0001", name="Import custom", category_id=sample_items)]
+    )
+
+    assert len(items) == 21
+    assert len({item.barcode for item in items}) == 21
+    assert items[-1].barcode == "CUSTOM0001"
+    assert items[0].is_low_stock
+    assert all(item.id is not None for item in items)
+    assert len(query_counter) <= 3
+
+
+def test_import_items_duplicate_barcode(sample_items, query_counter):
+    query_counter.clear()
+    with pytest.raises(ValueError, match="IT00000001 already exists"):
+        import_items([ItemCreate(barcode="IT00000001", name="Duplicate", category_id=sample_items)])
+    with pytest.raises(ValueError, match="NEW0000001 already exists"):
+        import_items(
+            [
+                ItemCreate(barcode="NEW0000001", name="New 1", category_id=sample_items),
+                ItemCreate(barcode="NEW0000001", name="New 2", category_id=sample_items),
+            ]
+        )
+    assert not any(statement.startswith("INSERT") for statement in query_counter)
+
+
+def test_import_items_does_not_retry_other_constraints(sample_items, query_counter):
+    query_counter.clear()
+    with pytest.raises(IntegrityError):
+        import_items([ItemCreate(name="Item 1", category_id=sample_items)])
+    assert sum(statement.startswith("SELECT items.barcode") for statement in query_counter) == 1
+
+
+def test_timestamps_set_by_database(sample_items):
+    with get_session() as session:
+        item = session.exec(select(Item).where(Item.barcode == "IT00000000")).one()
+        created_at = item.created_at
+        assert created_at.tzinfo is not None
+        assert item.updated_at == created_at
+
+        item.stock_quantity = 50
+        session.add(item)
+        session.commit()
+        session.refresh(item)
+        assert item.created_at == created_at
+        assert item.updated_at > created_at
+
+
+def test_item_response_json_datetimes(sample_items):
+    response = get_item_responses(category_id=sample_items)[0]
+
+    assert isinstance(response.created_at, datetime)
+    assert response.model_dump(mode="json")["created_at"] == response.created_at.isoformat().replace("+00:00", "Z")
+
+
+def test_barcode_reusable_after_deactivation(sample_items):
+    with get_session() as session:
+        assert get_item_by_barcode(session, "IT00000004") is None
+
+    items = import_items([ItemCreate(barcode="IT00000004", name="Item 4", category_id=sample_items)])
+
+    with get_session() as session:
+        item = get_item_by_barcode(session, "IT00000004")
+        assert item is not None
+        assert item.id == items[0].id
@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+from app.models import Item, Transaction, TransactionItem, UnitType, compute_line_totals
+
+
+def make_item() -> Item:
+    return Item(
+        id=1,
+        barcode="TEST000001",
+        name="Teh Botol",
+        category_id=1,
+        retail_selling_price=Decimal("3500.50"),
+        wholesale_selling_price=Decimal("40000"),
+        quantity_per_wholesale=12,
+    )
+
+
+def make_line(item: Item, quantity: int, unit_type: UnitType) -> TransactionItem:
+    line = TransactionItem(
+        transaction_id=1,
+        item_id=1,
+        quantity=quantity,
+        unit_type=unit_type,
+        unit_price=Decimal("0"),
+        total_price=Decimal("0"),
+        total_price_cents=0,
+        ecer_quantity=1,
+    )
+    line.calculate_totals(item)
+    return line
+
+
+def test_transaction_item_totals_in_cents():
+    item = make_item()
+
+    retail = make_line(item, 3, UnitType.ECER)
+    assert retail.total_price == Decimal("10501.50")
+    assert retail.total_price_cents == 1050150
+    assert retail.ecer_quantity == 3
+
+    wholesale = make_line(item, 2, UnitType.GROSIR)
+    assert wholesale.total_price == Decimal("80000")
+    assert wholesale.total_price_cents == 8000000
+    assert wholesale.ecer_quantity == 24
+
+
+def test_transaction_calculate_totals():
+    item = make_item()
+    transaction = Transaction(
+        transaction_number="TXN0001",
+        user_id=1,
+        tax_amount=Decimal("500"),
+        discount_amount=Decimal("1000"),
+        payment_amount=Decimal("100000"),
+    )
+    transaction.transaction_items = [make_line(item, 3, UnitType.ECER), make_line(item, 2, UnitType.GROSIR)]
+
+    transaction.calculate_totals()
+
+    assert transaction.subtotal == Decimal("90501.50")
+    assert transaction.total_amount == Decimal("90001.50")
+    assert transaction.change_amount == Decimal("9998.50")
+
+
+def test_generate_barcode_format():
+    barcodes = {make_item().generate_barcode() for _ in range(100)}
+
+    assert len(barcodes) == 100
+    assert all(len(barcode) == 10 for barcode in barcodes)
+    assert all(set(barcode) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZ234567") for barcode in barcodes)
+
+
+def test_compute_line_totals_derives_price_from_cents():
+    assert compute_line_totals(3, Decimal("3500.50")) == (Decimal("10501.50"), 1050150)
+    assert compute_line_totals(1, Decimal("0.10")) == (Decimal("0.10"), 10)
+
+
+def test_item_pricing_helpers():
+    item = make_item()
+
+    assert item.get_price_by_unit(UnitType.ECER) == Decimal("3500.50")
+    assert item.get_price_by_unit(UnitType.GROSIR) == Decimal("40000")
+    assert item.convert_to_ecer_quantity(2, UnitType.GROSIR) == 24
+    assert item.convert_to_ecer_quantity(2, UnitType.ECER) == 2
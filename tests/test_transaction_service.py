@@ -0,0 +1,420 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict
+import pytest
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
+from sqlmodel import col, select, text
+
+from app.database import get_session
+from app.models import (
+    Category,
+    Item,
+    StockMovement,
+    Transaction,
+    TransactionCreate,
+    TransactionItem,
+    TransactionItemCreate,
+    TransactionStatus,
+    UnitType,
+    User,
+    UserRole,
+)
+from app.transaction_service import (
+    checkout,
+    delete_transaction,
+    get_subtotal,
+    get_transaction,
+    get_transaction_responses,
+    list_transactions,
+    lock_items,
+    price_lines,
+)
+
+
+@pytest.fixture
+def sample_transactions(clean_db):
+    with get_session() as session:
+        cashier = User(username="kasir1", password_hash="x", full_name="Kasir Satu")
+        category = Category(name="Minuman")
+        session.add_all([cashier, category])
+        session.commit()
+        session.refresh(cashier)
+        session.refresh(category)
+        if cashier.id is None or category.id is None:
+            pytest.fail("Sample data was not persisted")
+
+        items = [
+            Item(
+                barcode=f"BC{i:08d}",
+                name=f"Item {i}",
+                category_id=category.id,
+                retail_selling_price=Decimal("1500"),
+                wholesale_selling_price=Decimal("16000"),
+                quantity_per_wholesale=12,
+                stock_quantity=100,
+            )
+            for i in range(5)
+        ]
+        session.add_all(items)
+        session.commit()
+
+        for t in range(3):
+            transaction = Transaction(user_id=cashier.id)
+            for item in items:
+                if item.id is None:
+                    pytest.fail("Sample item was not persisted")
+                # transaction_id is filled in from the relationship on flush
+                line = TransactionItem(
+                    transaction_id=0,
+                    item_id=item.id,
+                    quantity=2,
+                    unit_type=UnitType.ECER,
+                    unit_price=Decimal("0"),
+                    total_price=Decimal("0"),
+                    total_price_cents=0,
+                    ecer_quantity=1,
+                )
+                line.calculate_totals(item)
+                transaction.transaction_items.append(line)
+            transaction.calculate_totals()
+            session.add(transaction)
+        session.commit()
+        return cashier.id
+
+
+def test_list_transactions_query_count(sample_transactions, query_counter):
+    with get_session() as session:
+        query_counter.clear()
+        transactions = list_transactions(session)
+        for transaction in transactions:
+            assert transaction.user.full_name == "Kasir Satu"
+            for line in transaction.transaction_items:
+                assert line.item.name.startswith("Item")
+
+    assert len(transactions) == 3
+    assert len(query_counter) <= 2
+
+
+def test_list_transactions_raises_on_unloaded_relationship(sample_transactions):
+    with get_session() as session:
+        transactions = list_transactions(session)
+        line = transactions[0].transaction_items[0]
+        with pytest.raises(InvalidRequestError):
+            _ = line.item.category
+
+
+def test_get_transaction_responses(sample_transactions):
+    responses = get_transaction_responses(user_id=sample_transactions)
+
+    assert len(responses) == 3
+    assert all(len(r.items) == 5 for r in responses)
+    assert all(r.subtotal == Decimal("15000") for r in responses)
+    assert responses[0].user_name == "Kasir Satu"
+
+
+def test_get_subtotal(sample_transactions):
+    with get_session() as session:
+        transaction = list_transactions(session)[0]
+        if transaction.id is None:
+            pytest.fail("Sample transaction was not persisted")
+        assert get_subtotal(session, transaction.id) == Decimal("15000")
+        assert get_subtotal(session, -1) == Decimal("0")
+
+
+def test_lock_items_and_price_lines(sample_transactions, query_counter):
+    with get_session() as session:
+        items = list(session.exec(select(Item).order_by(col(Item.id))).all())
+        if items[0].id is None or items[1].id is None:
+            pytest.fail("Sample items were not persisted")
+
+        query_counter.clear()
+        locked = lock_items(session, {items[0].id, items[1].id})
+        assert len(query_counter) == 1
+        assert "FOR UPDATE" in query_counter[0]
+
+    rows = price_lines(
+        [
+            TransactionItemCreate(item_id=items[0].id, quantity=3, unit_type=UnitType.ECER),
+            TransactionItemCreate(item_id=items[1].id, quantity=2, unit_type=UnitType.GROSIR),
+            TransactionItemCreate(item_id=items[0].id, quantity=1, unit_type=UnitType.GROSIR),
+        ],
+        locked,
+    )
+    assert [row["total_price"] for row in rows] == [Decimal("4500"), Decimal("32000"), Decimal("16000")]
+    assert [row["ecer_quantity"] for row in rows] == [3, 24, 12]
+    assert [row["total_price_cents"] for row in rows] == [450000, 3200000, 1600000]
+
+
+def test_price_lines_unknown_item():
+    with pytest.raises(ValueError, match="not found"):
+        price_lines([TransactionItemCreate(item_id=-1, quantity=1)], {})
+
+
+def test_enums_stored_as_small_integers(sample_transactions):
+    with get_session() as session:
+        raw = (
+            session.connection()
+            .execute(text("SELECT DISTINCT unit_type, pg_typeof(unit_type)::text FROM transaction_items"))
+            .all()
+        )
+        assert [tuple(row) for row in raw] == [(1, "smallint")]
+
+        completed = session.exec(select(Transaction).where(Transaction.status == TransactionStatus.COMPLETED)).all()
+        assert completed == []
+        cashier = session.exec(select(User).where(User.role == UserRole.KASIR)).one()
+        assert cashier.role == UserRole.KASIR
+        assert list_transactions(session)[0].transaction_items[0].unit_type == UnitType.ECER
+
+
+def test_list_transactions_filters(sample_transactions):
+    with get_session() as session:
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        assert len(list_transactions(session, user_id=sample_transactions, since=today)) == 3
+        assert list_transactions(session, since=today + timedelta(days=1)) == []
+        assert len(list_transactions(session, status=TransactionStatus.PENDING, limit=2)) == 2
+
+        transaction = list_transactions(session)[0]
+        assert transaction.transaction_date.tzinfo is not None
+        assert transaction.transaction_date <= transaction.created_at
+
+
+def test_recompute_totals_in_database(sample_transactions, query_counter):
+    with get_session() as session:
+        transaction = list_transactions(session)[0]
+        transaction_id = transaction.id
+        if transaction_id is None:
+            pytest.fail("Sample transaction was not persisted")
+        transaction.tax_amount = Decimal("1000")
+        transaction.discount_amount = Decimal("500")
+        transaction.payment_amount = Decimal("20000")
+        transaction.subtotal = Decimal("0")
+        session.add(transaction)
+        session.commit()
+
+        query_counter.clear()
+        assert Transaction.recompute_totals(session, transaction_id) == Decimal("15500")
+        assert len(query_counter) == 1
+        session.commit()
+
+        refreshed = get_transaction(session, transaction_id)
+        assert refreshed is not None
+        assert refreshed.subtotal == Decimal("15000")
+        assert refreshed.total_amount == Decimal("15500")
+        assert refreshed.change_amount == Decimal("4500")
+
+
+def test_checkout(sample_transactions, query_counter):
+    with get_session() as session:
+        items = list(session.exec(select(Item).order_by(col(Item.id))).all())
+    first_id, second_id = items[0].id, items[1].id
+
+    query_counter.clear()
+    transaction_id = checkout(
+        sample_transactions,
+        TransactionCreate(
+            items=[
+                {"item_id": first_id, "quantity": 2, "unit_type": UnitType.ECER},
+                {"item_id": second_id, "quantity": 1, "unit_type": UnitType.GROSIR},
+                {"item_id": first_id, "quantity": 3, "unit_type": UnitType.ECER},
+            ],
+            payment_amount=Decimal("30000"),
+        ),
+    )
+    assert len(query_counter) <= 10
+    assert sum(statement.lstrip().startswith("UPDATE items") for statement in query_counter) == 1
+
+    with get_session() as session:
+        transaction = get_transaction(session, transaction_id)
+        assert transaction is not None
+        assert transaction.status == TransactionStatus.COMPLETED
+        lines = sorted(transaction.transaction_items, key=lambda line: line.id or 0)
+        assert [line.quantity for line in lines] == [2, 1, 3]
+        assert transaction.subtotal == Decimal("23500")
+        assert transaction.change_amount == Decimal("6500")
+
+        stock = {item.id: item.stock_quantity for item in session.exec(select(Item)).all()}
+        assert stock[first_id] == 95
+        assert stock[second_id] == 88
+
+        movements = list(session.exec(select(StockMovement).order_by(col(StockMovement.id))).all())
+        assert [(m.previous_stock, m.new_stock) for m in movements] == [(100, 98), (100, 88), (98, 95)]
+
+
+def test_checkout_insufficient_stock(sample_transactions):
+    with get_session() as session:
+        item = session.exec(select(Item).order_by(col(Item.id))).first()
+        if item is None or item.id is None:
+            pytest.fail("Sample item was not persisted")
+        item_id = item.id
+
+    with pytest.raises(ValueError, match="Insufficient stock"):
+        checkout(
+            sample_transactions,
+            TransactionCreate(
+                items=[{"item_id": item_id, "quantity": 9, "unit_type": UnitType.GROSIR}], payment_amount=Decimal("0")
+            ),
+        )
+
+    with get_session() as session:
+        reloaded = session.get(Item, item_id)
+        assert reloaded is not None
+        assert reloaded.stock_quantity == 100
+        assert len(list_transactions(session)) == 3
+
+
+def test_checkout_rejects_inactive_item(sample_transactions):
+    with get_session() as session:
+        item = session.exec(select(Item).order_by(col(Item.id))).first()
+        if item is None or item.id is None:
+            pytest.fail("Sample item was not persisted")
+        item_id = item.id
+        item.is_active = False
+        session.add(item)
+        session.commit()
+
+    with pytest.raises(ValueError, match="not found"):
+        checkout(
+            sample_transactions,
+            TransactionCreate(items=[{"item_id": item_id, "quantity": 1}], payment_amount=Decimal("1500")),
+        )
+
+    with get_session() as session:
+        reloaded = session.get(Item, item_id)
+        assert reloaded is not None
+        assert reloaded.stock_quantity == 100
+        assert len(list_transactions(session)) == 3
+
+
+def test_checkout_insufficient_payment(sample_transactions, query_counter):
+    with get_session() as session:
+        item = session.exec(select(Item).order_by(col(Item.id))).first()
+        if item is None or item.id is None:
+            pytest.fail("Sample item was not persisted")
+        item_id = item.id
+        last_number = max(t.transaction_number for t in list_transactions(session))
+
+    query_counter.clear()
+    with pytest.raises(ValueError, match="Insufficient payment"):
+        checkout(
+            sample_transactions,
+            TransactionCreate(
+                items=[{"item_id": item_id, "quantity": 2, "unit_type": UnitType.ECER}], payment_amount=Decimal("2999")
+            ),
+        )
+    assert not any(statement.lstrip().upper().startswith(("INSERT", "UPDATE")) for statement in query_counter)
+
+    with get_session() as session:
+        reloaded = session.get(Item, item_id)
+        assert reloaded is not None
+        assert reloaded.stock_quantity == 100
+        assert len(list_transactions(session)) == 3
+        assert session.exec(select(StockMovement)).all() == []
+
+    # The rejected sale did not consume a transaction number
+    transaction_id = checkout(
+        sample_transactions,
+        TransactionCreate(items=[{"item_id": item_id, "quantity": 2}], payment_amount=Decimal("3000")),
+    )
+    with get_session() as session:
+        transaction = session.get(Transaction, transaction_id)
+        assert transaction is not None
+        assert int(transaction.transaction_number[3:]) == int(last_number[3:]) + 1
+
+
+def test_checkout_rejects_negative_total(sample_transactions):
+    with get_session() as session:
+        item = session.exec(select(Item).order_by(col(Item.id))).first()
+        if item is None or item.id is None:
+            pytest.fail("Sample item was not persisted")
+        item_id = item.id
+
+    with pytest.raises(ValueError, match="Discount exceeds"):
+        checkout(
+            sample_transactions,
+            TransactionCreate(
+                items=[{"item_id": item_id, "quantity": 1}],
+                discount_amount=Decimal("5000"),
+                payment_amount=Decimal("0"),
+            ),
+        )
+
+    with get_session() as session:
+        assert len(list_transactions(session)) == 3
+
+
+def test_checkout_requires_items(sample_transactions):
+    with pytest.raises(ValueError, match="at least one item"):
+        checkout(sample_transactions, TransactionCreate(payment_amount=Decimal("0")))
+
+
+def test_transaction_numbers_assigned_by_sequence(sample_transactions):
+    with get_session() as session:
+        numbers = sorted(t.transaction_number for t in list_transactions(session))
+
+    assert len(set(numbers)) == 3
+    assert all(number.startswith("TXN") and len(number) == 12 and number[3:].isdigit() for number in numbers)
+
+
+def _checkout_single_item(user_id: int) -> int:
+    with get_session() as session:
+        item = session.exec(select(Item).order_by(col(Item.id))).first()
+        if item is None or item.id is None:
+            pytest.fail("Sample item was not persisted")
+        item_id = item.id
+    return checkout(
+        user_id, TransactionCreate(items=[{"item_id": item_id, "quantity": 1}], payment_amount=Decimal("1500"))
+    )
+
+
+def _assert_lines_deleted(transaction_id: int) -> None:
+    with get_session() as session:
+        remaining = session.exec(select(TransactionItem).where(TransactionItem.transaction_id == transaction_id)).all()
+        assert remaining == []
+        assert session.get(Transaction, transaction_id) is None
+        movement = session.exec(select(StockMovement)).one()
+        assert movement.transaction_item_id is None
+
+
+def test_session_delete_removes_lines(sample_transactions):
+    transaction_id = _checkout_single_item(sample_transactions)
+
+    with get_session() as session:
+        transaction = session.get(Transaction, transaction_id)
+        assert transaction is not None
+        session.delete(transaction)
+        session.commit()
+
+    _assert_lines_deleted(transaction_id)
+
+
+def test_delete_transaction_cascades_in_database(sample_transactions, query_counter):
+    transaction_id = _checkout_single_item(sample_transactions)
+
+    with get_session() as session:
+        query_counter.clear()
+        assert delete_transaction(session, transaction_id)
+        session.commit()
+        assert len(query_counter) == 1
+        assert not any("transaction_items" in statement for statement in query_counter)
+        assert not delete_transaction(session, transaction_id)
+
+    _assert_lines_deleted(transaction_id)
+
+
+def test_line_without_cents_is_rejected(sample_transactions):
+    with get_session() as session:
+        transaction = list_transactions(session)[0]
+        item = session.exec(select(Item)).first()
+        if transaction.id is None or item is None or item.id is None:
+            pytest.fail("Sample data was not persisted")
+        values: Dict[str, Any] = {
+            "transaction_id": transaction.id,
+            "item_id": item.id,
+            "quantity": 1,
+            "unit_price": Decimal("1500"),
+            "total_price": Decimal("1500"),
+            "ecer_quantity": 1,
+        }
+        session.add(TransactionItem(**values))
+        with pytest.raises(IntegrityError):
+            session.commit()